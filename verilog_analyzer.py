@@ -7,48 +7,334 @@ a comprehensive specification document in LaTeX format based on a template.
 """
 
 import os
+import asyncio
+import hashlib
+import io
+import json
+import math
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 import yaml
-import glob
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, NamedTuple, Optional, Tuple, TextIO
 import re
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
 import logging
 
 try:
-    from openai import AzureOpenAI
+    from openai import AzureOpenAI, AsyncAzureOpenAI, APIConnectionError, APITimeoutError, RateLimitError
 except ImportError:
     print("Error: OpenAI library not installed. Please run: pip install openai")
     exit(1)
 
+try:
+    from tenacity import before_sleep_log, retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+except ImportError:
+    print("Error: tenacity library not installed. Please run: pip install tenacity")
+    exit(1)
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; cache appends are then unlocked
+    fcntl = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Retry policy shared by every Azure OpenAI call: transient failures (rate
+# limits, timeouts, dropped connections) are retried with exponential backoff
+llm_retry = retry(
+    retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+    wait=wait_exponential(multiplier=1, min=2, max=60),
+    stop=stop_after_attempt(5),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed"""
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode()
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is installed"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write a file via a sibling temporary file and rename, so readers never see it half-written"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        partial_path.write_bytes(data)
+        os.replace(partial_path, path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+
+class _JsonlCache:
+    """Append-only JSON Lines store of cached LLM responses, held in memory once loaded"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path):
+            return
+        
+        lines = 0
+        with open(path, 'rb') as file:
+            for line in file:
+                lines += 1
+                try:
+                    record = _json_loads(line)
+                except ValueError:
+                    continue  # Torn line from an interrupted write
+                # Valid JSON that is not a cache record would otherwise fail the load
+                if (not isinstance(record, dict) or not isinstance(record.get('k'), str) or 'v' not in record
+                        or not isinstance(record.get('e'), (int, float, type(None)))):
+                    continue
+                # Later lines supersede earlier ones for the same key
+                self._entries[record['k']] = record
+        
+        # Compact: drop expired, superseded and torn records so the file (and the
+        # next load) only holds the live set
+        now = time.time()
+        self._entries = {
+            key: record for key, record in self._entries.items()
+            if record.get('e') is None or record['e'] >= now
+        }
+        if len(self._entries) < lines:
+            _atomic_write_bytes(Path(path), b''.join(_json_dumps(record) + b'\n' for record in self._entries.values()))
+    
+    def _live_record(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the record for a key unless it is missing or expired"""
+        record = self._entries.get(key)
+        if record is not None and record.get('e') is not None and record['e'] < time.time():
+            del self._entries[key]
+            return None
+        return record
+    
+    def __contains__(self, key: str) -> bool:
+        return self._live_record(key) is not None
+    
+    def get(self, key: str) -> Optional[str]:
+        record = self._live_record(key)
+        return None if record is None else record['v']
+    
+    def set(self, key: str, value: str, expire: Optional[float] = None) -> None:
+        record = {'k': key, 'v': value, 'e': time.time() + expire if expire else None}
+        self._entries[key] = record
+        with open(self.path, 'ab') as file:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            file.write(_json_dumps(record) + b'\n')
+
+class LRUCache:
+    """In-memory mapping that evicts its least recently used entries beyond maxsize"""
+    
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+    
+    def put(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def resize(self, maxsize: int) -> None:
+        """Change the capacity, evicting the oldest entries if it shrank"""
+        self.maxsize = maxsize
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of the entries, oldest first, for persisting"""
+        return dict(self._entries)
+    
+    def describe(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return f"{len(self)}/{self.maxsize} entries, {self.hits}/{lookups} hits ({rate:.0%})"
+
+# Bump whenever the analysis prompt changes so stored analyses keyed on the
+# old wording are not reused
+PROMPT_VERSION = "2"
+
+# Bump whenever parsing changes so modules cached by file content hash are re-parsed
+PARSER_VERSION = "5"
+
+# Fixed instructions for document generation. The document is generated in
+# parts (introduction, one section per module, conclusions); each part's system
+# message is DOCUMENT_SYSTEM_PROMPT plus that part's instructions, kept constant so
+# it is byte-identical across calls and hits the prompt prefix cache.
+DOCUMENT_SYSTEM_PROMPT = """You are an expert digital design engineer and technical writer. Create comprehensive, professional documentation.
+
+You are writing one part of a digital design specification document for Verilog modules. The user provides the module information for your part.
+
+FORMATTING REQUIREMENTS:
+- Use LaTeX formatting (\\section{}, \\subsection{}, etc.)
+- Do NOT include \\documentclass, \\usepackage, \\begin{document} or \\end{document}
+- Do NOT include any preamble or document setup commands
+- Do NOT include \\tableofcontents; it is added when the parts are assembled
+- ONLY provide the LaTeX content for your part
+- Use proper LaTeX syntax for all formatting
+- Include academic-style content suitable for a university specification document"""
+
+INTRO_INSTRUCTIONS = """YOUR PART: the opening of the document.
+1. Title page (\\begin{center} environment with title, institution, date)
+2. An introduction/overview section describing the design as a whole and how the modules relate"""
+
+MODULE_SECTION_INSTRUCTIONS = """YOUR PART: the dedicated section for exactly one module, starting with \\section{<module name>}, containing:
+- Complete code listing (use \\begin{verbatim} \\end{verbatim} for code)
+- Detailed functional analysis
+- Interface description (inputs, outputs, parameters)
+- Behavioral analysis
+- Timing considerations
+- Design patterns used
+- Potential improvements
+Create subsections as appropriate."""
+
+CONCLUSIONS_INSTRUCTIONS = """YOUR PART: the closing of the document.
+1. A conclusions/summary section drawing together the analyses of all modules
+2. Any other closing sections you deem appropriate (references, appendices, etc.)"""
+
+class Ports(NamedTuple):
+    """Port names by direction and (name, default) parameter pairs extracted from a module"""
+    inputs: List[str]
+    outputs: List[str]
+    inouts: List[str]
+    parameters: List[Tuple[str, str]]
+
+@dataclass(slots=True)
 class VerilogModule:
     """Data class to store information about a Verilog module"""
     name: str
     filename: str
     code: str
-    ports: Dict[str, Any]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    inouts: List[str] = field(default_factory=list)
+    parameters: List[Tuple[str, str]] = field(default_factory=list)
     description: str = ""
     analysis: str = ""
+    code_digest: str = ""
+    embedding: Optional[List[float]] = None
+    # Identifiers in instantiation position, resolved against the loaded
+    # modules into dependencies before analysis
+    instances: List[str] = field(default_factory=list)
+    dependencies: List[str] = field(default_factory=list)
+    analysis_key: str = ""
+
+# Static document parts used when the corresponding LLM call fails
+FALLBACK_INTRO = """\\begin{center}
+{\\Huge{Verilog Module Specification}} \\\\
+\\vspace{2mm}
+{\\Large{Digital Design Analysis}} \\\\
+\\vspace{1mm}
+{\\Large{Technical Documentation}}
+\\end{center}
+
+\\section{Introduction}
+This document provides a comprehensive analysis of Verilog modules for digital design applications."""
+
+FALLBACK_CONCLUSIONS = """\\section{Conclusions}
+Summary and conclusions would be provided here."""
 
 class VerilogAnalyzer:
     """Main class for analyzing Verilog files and generating LaTeX documentation"""
     
+    # Embedding request limits: characters of source embedded per module, and
+    # inputs per embeddings call
+    _EMBED_MAX_CHARS = 8000
+    _EMBED_BATCH_SIZE = 2048
+    
+    # Characters of analysis quoted in whole-project document prompts: in total,
+    # shared evenly between modules, and at most per module. Shares below the
+    # minimum are dropped so large projects send interfaces only.
+    _SUMMARY_ANALYSIS_CHARS = 24000
+    _SUMMARY_PREVIEW_MAX_CHARS = 1500
+    _SUMMARY_PREVIEW_MIN_CHARS = 200
+    
+    # Verilog patterns, compiled once for all files
+    # Comments and blank-line runs removed from code before it is sent for analysis
+    _CODE_CLEAN = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+    _RE_TRAILING_SPACE = re.compile(r'[ \t]+$', re.MULTILINE)
+    _RE_BLANK_LINES = re.compile(r'\n\s*\n+')
+    
+    # Comments and whitespace runs, collapsed before the structural regexes run so
+    # they scan less text and cannot match declarations inside comments. A run of
+    # comments takes the whitespace around it, so every gap between tokens ends
+    # up as exactly one space. Lone spaces are left alone rather than replaced by
+    # themselves.
+    _RE_STRIP = re.compile(r'\s*(?:(?://[^\n]*|/\*.*?\*/)\s*)+|\s{2,}|[\t\n\r\f\v]', re.DOTALL)
+    _RE_MODULE = re.compile(r'\bmodule\s+(\w+)')
+    # Single alternation over port, parameter and instantiation syntax so each
+    # stripped file is scanned once, all alternatives advancing together.
+    # Port declarations capture a comma-separated name list (``input a, b, c;``)
+    # that stops at the next ANSI-style direction keyword. Instantiations are
+    # ``child #(...) u_child (`` with at most one level of nesting in the
+    # parameter list, matched against the single spaces stripping leaves.
+    _RE_DECLARATION = re.compile(
+        r'\b(?P<kind>input|output|inout)\b\s*(?:(?:wire|reg|logic)\b\s*)?(?:signed\b\s*)?(?:\[[^\]]*\]\s*)?'
+        r'(?P<names>\w+(?:\s*,\s*(?!(?:input|output|inout|parameter)\b)\w+)*)'
+        r'|\bparameter\b\s+(?P<param>\w+)\s*=\s*(?P<value>[^,;\)]+)'
+        r'|\b(?P<instance>\w+) (?:#\s*\((?:[^()]|\([^()]*\))*\)\s*)?\w+ ?\('
+    )
+    
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize the analyzer with configuration"""
         self.config = self._load_config(config_path)
         self.client = self._initialize_openai_client()
+        self.aclient = self._initialize_openai_client(AsyncAzureOpenAI)
+        self.cache = self._initialize_cache()
+        self.semantic_index = self._load_semantic_index()
+        self.hash_cache = self._load_hash_cache()
+        self.stats = {stage: self._empty_stage_stats() for stage in ('analyze', 'embed', 'document')}
         self.modules: List[VerilogModule] = []
+        self.modules_by_name: Dict[str, VerilogModule] = {}
+        # Comma-separated names of the loaded modules, kept in step by add_modules
+        self._module_names_csv = ""
+        # Set when modules are added; the dependency graph and analysis keys are
+        # rebuilt on the next lookup rather than on every one
+        self._dependencies_stale = False
         
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file"""
         try:
             with open(config_path, 'r') as file:
-                config = yaml.safe_load(file)
+                config = yaml.load(file, Loader=SafeLoader)
             logger.info(f"Configuration loaded from {config_path}")
             return config
         except FileNotFoundError:
@@ -58,8 +344,8 @@ class VerilogAnalyzer:
             logger.error(f"Error parsing configuration file: {e}")
             raise
     
-    def _initialize_openai_client(self) -> AzureOpenAI:
-        """Initialize Azure OpenAI client"""
+    def _initialize_openai_client(self, client_class=AzureOpenAI):
+        """Initialize Azure OpenAI client (sync by default, or AsyncAzureOpenAI)"""
         config = self.config['azure_openai']
         
         # Get configuration values
@@ -82,127 +368,623 @@ class VerilogAnalyzer:
                 logger.error(f"Azure OpenAI endpoint not found. Please set {env_var} environment variable or update config.yaml")
                 raise ValueError("Azure OpenAI endpoint not configured")
         
-        return AzureOpenAI(
+        # Retries are left to llm_retry so one policy bounds the attempts per call
+        return client_class(
             api_key=api_key,
             azure_endpoint=endpoint,
-            api_version=api_version
+            api_version=api_version,
+            max_retries=0
         )
     
+    @staticmethod
+    def _empty_stage_stats() -> Dict[str, int]:
+        """Create the per-stage counters reported in the run summary"""
+        return {
+            'invocations': 0,
+            'exact_hits': 0,
+            'semantic_hits': 0,
+            'llm_calls': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'total_tokens': 0
+        }
+    
+    def _record_usage(self, stage: str, usage: Any) -> None:
+        """Accumulate token usage from an API response (object or batch JSON dict)"""
+        stats = self.stats[stage]
+        stats['llm_calls'] += 1
+        if usage is None:
+            return
+        for field_name in ('prompt_tokens', 'completion_tokens', 'total_tokens'):
+            value = usage.get(field_name) if isinstance(usage, dict) else getattr(usage, field_name, None)
+            stats[field_name] += value or 0
+    
+    def _initialize_cache(self):
+        """Open the persistent LLM response cache, or return None if caching is disabled"""
+        cache_config = self.config.get('cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+        
+        cache_path = os.path.join(self._cache_dir(), 'responses.jsonl')
+        logger.info(f"Using LLM response cache at {cache_path}")
+        return _JsonlCache(cache_path)
+    
+    def _cache_dir(self) -> str:
+        """Resolve the directory holding all persistent cache data"""
+        return os.path.expanduser(self.config.get('cache', {}).get('directory', '~/.verilog_analyzer_cache'))
+    
+    def _load_semantic_index(self) -> Optional[List[Dict[str, Any]]]:
+        """Load the persisted (embedding, analysis) index, or return None if semantic caching is disabled"""
+        cache_config = self.config.get('cache', {})
+        if not cache_config.get('enabled', True) or not cache_config.get('semantic', False):
+            return None
+        
+        index_path = os.path.join(self._cache_dir(), 'semantic_index.json')
+        if not os.path.exists(index_path):
+            return []
+        
+        try:
+            with open(index_path, 'rb') as file:
+                index = _json_loads(file.read())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable semantic cache index {index_path}: {e}")
+            return []
+        
+        # Analyses written under another prompt version or model, or embedded by
+        # another embedding model, must not be served as hits
+        stamp = self._semantic_stamp()
+        live = [entry for entry in index if all(entry.get(k) == v for k, v in stamp.items())]
+        if len(live) < len(index):
+            logger.info(f"Discarding {len(index) - len(live)} semantic cache entries from another prompt version or model")
+        for entry in live:
+            entry['embedding'] = self._normalize(entry['embedding'])
+        logger.info(f"Loaded {len(live)} entries from semantic cache index")
+        return live
+    
+    def _semantic_stamp(self) -> Dict[str, str]:
+        """Prompt version and models a semantic cache entry must match to be reused"""
+        return {
+            'prompt_version': PROMPT_VERSION,
+            'model': self.config['azure_openai']['deployment_name'],
+            'embedding_model': self.config['cache'].get('embedding_deployment', 'text-embedding-3-small'),
+        }
+    
+    def _state_path(self) -> str:
+        """Resolve the file holding analyses from previous runs, keyed by code digest"""
+        default = os.path.join(self._cache_dir(), 'analysis_state.json')
+        return os.path.expanduser(self.config.get('cache', {}).get('state_file', default))
+    
+    def _load_hash_cache(self) -> Optional[LRUCache]:
+        """Load the {analysis key: analysis} map from previous runs, or None if caching is disabled"""
+        cache_config = self.config.get('cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+        
+        hash_cache = LRUCache(cache_config.get('analysis_maxsize', 1024))
+        state_path = Path(self._state_path())
+        if not state_path.exists():
+            return hash_cache
+        
+        try:
+            state = _json_loads(state_path.read_bytes())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable analysis state {state_path}: {e}")
+            return hash_cache
+        
+        # Analyses stored under another prompt version can never be hit again, so
+        # drop them on load rather than letting them occupy the LRU
+        if state.get('prompt_version') != PROMPT_VERSION:
+            logger.info(f"Discarding analysis state from prompt version {state.get('prompt_version')}")
+            return hash_cache
+        for key, analysis in state['analyses'].items():
+            hash_cache.put(key, analysis)
+        return hash_cache
+    
+    def _save_hash_cache(self) -> None:
+        """Persist the {code digest: analysis} map for the next run"""
+        if self.hash_cache is None:
+            return
+        state = {'prompt_version': PROMPT_VERSION, 'analyses': self.hash_cache.to_dict()}
+        _atomic_write_bytes(Path(self._state_path()), _json_dumps(state))
+    
+    def _resolve_dependencies(self) -> None:
+        """Link loaded modules to the modules they instantiate and derive their analysis keys"""
+        self.modules_by_name = {}
+        for module in self.modules:
+            self.modules_by_name.setdefault(module.name, module)
+        for module in self.modules:
+            module.dependencies = [
+                name for name in module.instances
+                if name in self.modules_by_name and name != module.name
+            ]
+        self._dependencies_stale = False
+        
+        # Each key covers the module's own source and, Merkle-style, the keys of the
+        # modules it instantiates, so a change anywhere below a module invalidates
+        # its stored analysis while unrelated modules keep theirs
+        model = self.config['azure_openai']['deployment_name']
+        keys: Dict[int, str] = {}
+        
+        def _key(module: VerilogModule, visiting: frozenset) -> str:
+            if id(module) not in keys:
+                visiting = visiting | {module.name}
+                children = [
+                    _key(self.modules_by_name[name], visiting)
+                    for name in module.dependencies if name not in visiting
+                ]
+                material = f"{module.code_digest}:{PROMPT_VERSION}:{model}:{','.join(children)}"
+                keys[id(module)] = hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+            return keys[id(module)]
+        
+        for module in self.modules:
+            module.analysis_key = _key(module, frozenset())
+    
+    def _ensure_dependencies(self) -> None:
+        """Resolve the dependency graph if modules were added since it was last built"""
+        if self._dependencies_stale:
+            self._resolve_dependencies()
+    
+    def _analysis_key(self, module: VerilogModule) -> str:
+        """Key a module's analysis by its source and dependencies, the prompt version and the model"""
+        if self._dependencies_stale or not module.analysis_key:
+            self._resolve_dependencies()
+        return module.analysis_key
+    
+    def _stored_analysis(self, module: VerilogModule) -> Optional[str]:
+        """Return the analysis stored for unchanged source, counting it as an exact hit"""
+        if self.hash_cache is None:
+            return None
+        analysis = self.hash_cache.get(self._analysis_key(module))
+        if analysis is not None:
+            self.stats['analyze']['invocations'] += 1
+            self.stats['analyze']['exact_hits'] += 1
+        return analysis
+    
+    def _remember_analysis(self, module: VerilogModule, analysis: str) -> None:
+        """Record a successful analysis against the module's analysis key"""
+        if self.hash_cache is not None:
+            self.hash_cache.put(self._analysis_key(module), analysis)
+    
+    def _add_semantic_entry(self, embedding: List[float], analysis: str) -> None:
+        """Index an analysis by embedding, dropping the oldest entries beyond cache.semantic_maxsize"""
+        self.semantic_index.append({'embedding': embedding, 'analysis': analysis, **self._semantic_stamp()})
+        overflow = len(self.semantic_index) - self.config['cache'].get('semantic_maxsize', 1000)
+        if overflow > 0:
+            del self.semantic_index[:overflow]
+    
+    def _save_semantic_index(self) -> None:
+        """Persist the semantic cache index under the cache directory"""
+        if self.semantic_index is None:
+            return
+        _atomic_write_bytes(Path(self._cache_dir()) / 'semantic_index.json', _json_dumps(self.semantic_index))
+    
+    @staticmethod
+    def _normalize(vector: List[float]) -> List[float]:
+        """Scale a vector to unit length so cosine similarity is a plain dot product"""
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector] if norm else vector
+    
+    @llm_retry
+    async def _embed_modules(self, modules: List[VerilogModule]) -> None:
+        """Embed the source of every module that has no embedding yet, batching inputs per request"""
+        pending = [module for module in modules if module.embedding is None]
+        
+        for start in range(0, len(pending), self._EMBED_BATCH_SIZE):
+            chunk = pending[start:start + self._EMBED_BATCH_SIZE]
+            response = await self.aclient.embeddings.create(
+                model=self.config['cache'].get('embedding_deployment', 'text-embedding-3-small'),
+                input=[module.code[:self._EMBED_MAX_CHARS] for module in chunk]
+            )
+            self.stats['embed']['invocations'] += 1
+            self._record_usage('embed', response.usage)
+            for module, item in zip(chunk, response.data):
+                module.embedding = self._normalize(item.embedding)
+    
+    def _semantic_lookup(self, embedding: List[float]) -> Optional[str]:
+        """Return the cached analysis of the most similar module if it clears the similarity threshold"""
+        threshold = self.config['cache'].get('semantic_threshold', 0.92)
+        best_score, best_analysis = -1.0, None
+        
+        # Both sides are unit vectors, so the dot product is the cosine similarity
+        for entry in self.semantic_index:
+            score = sum(a * b for a, b in zip(embedding, entry['embedding']))
+            if score > best_score:
+                best_score, best_analysis = score, entry['analysis']
+        
+        return best_analysis if best_score >= threshold else None
+    
+    def _cache_key(self, request: Dict[str, Any]) -> str:
+        """Hash the prompt, model and temperature of a chat completion request"""
+        prompt = "".join(message['content'] for message in request['messages'])
+        return hashlib.sha256((prompt + request['model'] + str(request['temperature'])).encode()).hexdigest()
+    
+    def _cache_get(self, key: str, stage: str) -> Optional[str]:
+        """Look up a cached LLM response, recording a hit against the given stage"""
+        if self.cache is None:
+            return None
+        
+        value = self.cache.get(key)
+        if value is not None:
+            self.stats[stage]['exact_hits'] += 1
+        return value
+    
+    def _cache_set(self, key: str, value: str) -> None:
+        """Store an LLM response in the cache"""
+        if self.cache is not None:
+            self.cache.set(key, value, expire=self.config.get('cache', {}).get('ttl'))
+    
     def load_verilog_files(self, input_dir: str = None) -> None:
-        """Load all Verilog files from the input directory"""
+        """Load all Verilog files from the input directory and its subdirectories"""
         if input_dir is None:
             input_dir = self.config['input']['directory']
         
-        extensions = self.config['input']['file_extensions']
-        verilog_files = []
-        
-        for ext in extensions:
-            pattern = os.path.join(input_dir, f"*{ext}")
-            verilog_files.extend(glob.glob(pattern))
-        
+        verilog_files = self._find_verilog_files(input_dir)
         logger.info(f"Found {len(verilog_files)} Verilog files")
         
-        for file_path in verilog_files:
-            self._parse_verilog_file(file_path)
+        # File reads and regex scans are independent per file, so fan them out
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self._read_verilog_module, verilog_files))
+        
+        self.add_modules(module for module in results if module is not None)
+    
+    def add_modules(self, modules: Iterable[VerilogModule]) -> None:
+        """Add loaded modules, indexing them by name; the first module loaded under a name wins lookups"""
+        names = [self._module_names_csv] if self._module_names_csv else []
+        for module in modules:
+            self.modules.append(module)
+            self.modules_by_name.setdefault(module.name, module)
+            names.append(module.name)
+        self._module_names_csv = ', '.join(names)
+        self._dependencies_stale = True
+    
+    def _find_verilog_files(self, input_dir: str) -> List[str]:
+        """List the Verilog files under input_dir in a stable order"""
+        # Walk the tree once and filter by suffix, rather than one glob per extension
+        extensions = set(self.config['input']['file_extensions'])
+        return sorted(str(path) for path in Path(input_dir).rglob('*') if path.suffix in extensions)
+    
+    def _parse_verilog_file(self, file_path: str) -> Optional[VerilogModule]:
+        """Parse a single Verilog file and add its module to the loaded modules"""
+        module = self._read_verilog_module(file_path)
+        if module is not None:
+            self.add_modules([module])
+        return module
     
-    def _parse_verilog_file(self, file_path: str) -> None:
-        """Parse a single Verilog file and extract module information"""
+    def _read_verilog_module(self, file_path: str) -> Optional[VerilogModule]:
+        """Read and parse a single Verilog file without modifying analyzer state"""
         try:
-            with open(file_path, 'r') as file:
-                code = file.read()
-            
-            # Extract module name using regex
-            module_match = re.search(r'module\s+(\w+)', code)
-            if not module_match:
-                logger.warning(f"No module found in {file_path}")
-                return
-            
-            module_name = module_match.group(1)
-            filename = os.path.basename(file_path)
-            
-            # Extract ports (simplified parsing)
-            ports = self._extract_ports(code)
+            if self._exceeds_size_limit(file_path, os.path.getsize(file_path)):
+                return None
             
-            module = VerilogModule(
-                name=module_name,
-                filename=filename,
-                code=code,
-                ports=ports
-            )
-            
-            self.modules.append(module)
-            logger.info(f"Loaded module '{module_name}' from {filename}")
+            code = self._decode_source(Path(file_path).read_bytes())
+            return self._parse_verilog_source(code, file_path)
             
         except Exception as e:
             logger.error(f"Error parsing {file_path}: {e}")
+            return None
     
-    def _extract_ports(self, code: str) -> Dict[str, Any]:
-        """Extract port information from Verilog code (simplified)"""
-        ports = {'inputs': [], 'outputs': [], 'parameters': []}
+    @staticmethod
+    def _decode_source(data: bytes) -> str:
+        """Decode file bytes as text with universal newlines, so CRLF and LF copies of a file match"""
+        return data.decode(errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+    
+    def _exceeds_size_limit(self, file_path: str, size: int) -> bool:
+        """Check a file against input.max_file_bytes, warning when it is skipped"""
+        max_bytes = self.config['input'].get('max_file_bytes', 2_000_000)
+        if size > max_bytes:
+            logger.warning(f"Skipping {file_path}: {size} bytes exceeds max_file_bytes ({max_bytes})")
+            return True
+        return False
+    
+    @classmethod
+    def _parse_verilog_source(cls, code: str, file_path: str) -> Optional[VerilogModule]:
+        """Build a module from Verilog source; needs no analyzer state, so it can run in worker processes"""
+        # Extract module name using regex
+        stripped = cls._strip_source(code)
+        module_match = cls._RE_MODULE.search(stripped)
+        if not module_match:
+            logger.warning(f"No module found in {file_path}")
+            return None
+        
+        module_name = module_match.group(1)
+        filename = os.path.basename(file_path)
         
-        # Find input ports
-        input_matches = re.findall(r'input\s+(?:wire\s+|reg\s+)?(?:\[[\d:\s]+\]\s+)?(\w+)', code)
-        ports['inputs'] = input_matches
+        # Extract ports and instantiated module names (simplified parsing)
+        ports, instances = cls._scan_declarations(stripped)
         
-        # Find output ports
-        output_matches = re.findall(r'output\s+(?:wire\s+|reg\s+)?(?:\[[\d:\s]+\]\s+)?(\w+)', code)
-        ports['outputs'] = output_matches
+        module = VerilogModule(
+            name=module_name,
+            filename=filename,
+            code=code,
+            inputs=ports.inputs,
+            outputs=ports.outputs,
+            inouts=ports.inouts,
+            parameters=ports.parameters,
+            code_digest=hashlib.blake2b(code.encode(), digest_size=16).hexdigest(),
+            instances=sorted(instances)
+        )
         
-        # Find parameters
-        param_matches = re.findall(r'parameter\s+(\w+)\s*=\s*([^,\)]+)', code)
-        ports['parameters'] = param_matches
+        logger.info(f"Loaded module '{module_name}' from {filename}")
+        return module
+    
+    @classmethod
+    def _strip_source(cls, code: str) -> str:
+        """Collapse comments and whitespace runs ahead of the structural regexes"""
+        return cls._RE_STRIP.sub(' ', code)
+    
+    @classmethod
+    def _extract_ports(cls, code: str) -> Ports:
+        """Extract port information from Verilog code (simplified)"""
+        return cls._scan_declarations(cls._strip_source(code))[0]
+    
+    @classmethod
+    def _scan_declarations(cls, stripped: str) -> Tuple[Ports, set]:
+        """Collect ports, parameters and instantiated names from stripped source in one pass"""
+        ports = Ports(inputs=[], outputs=[], inouts=[], parameters=[])
+        by_kind = {'input': ports.inputs, 'output': ports.outputs, 'inout': ports.inouts}
+        instances = set()
+        
+        for match in cls._RE_DECLARATION.finditer(stripped):
+            kind = match['kind']
+            if kind:
+                by_kind[kind].extend(name.strip() for name in match['names'].split(','))
+            elif match['param']:
+                ports.parameters.append((match['param'], match['value'].strip()))
+            else:
+                instances.add(match['instance'])
         
-        return ports
+        return ports, instances
     
     def analyze_modules(self) -> None:
-        """Analyze all loaded modules using LLM"""
+        """Analyze all loaded modules using LLM (synchronous wrapper)"""
+        asyncio.run(self._analyze_all())
+    
+    async def _analyze_all(self, concurrency: Optional[int] = None) -> None:
+        """Analyze all loaded modules concurrently with a bounded number of in-flight requests"""
         logger.info("Starting LLM analysis of modules...")
         
-        for module in self.modules:
-            logger.info(f"Analyzing module: {module.name}")
-            analysis = self._analyze_single_module(module)
-            module.analysis = analysis
+        # Modules whose source is unchanged since a previous run reuse that analysis
+        # without building a prompt or touching the API
+        self._resolve_dependencies()
+        misses = self.modules
+        if self.hash_cache is not None:
+            misses = []
+            for module in self.modules:
+                analysis = self._stored_analysis(module)
+                if analysis is None:
+                    misses.append(module)
+                else:
+                    module.analysis = analysis
+            logger.info(f"{len(self.modules) - len(misses)} modules unchanged since last run, "
+                        f"{len(misses)} changed or depend on a changed module "
+                        f"(analysis cache: {self.hash_cache.describe()})")
+        
+        if not misses:
+            return
+        
+        try:
+            if self.config['azure_openai'].get('use_batch', False):
+                await asyncio.to_thread(self._analyze_modules_batch, misses)
+            else:
+                await self._analyze_concurrently(misses, concurrency)
+        finally:
+            self._save_hash_cache()
+            self._save_semantic_index()
+    
+    async def _analyze_concurrently(self, modules: List[VerilogModule], concurrency: Optional[int] = None) -> None:
+        """Analyze modules with individual requests, bounded by the given or configured concurrency"""
+        if self.semantic_index is not None:
+            # One embeddings request for every module the exact cache cannot serve,
+            # instead of one request per module
+            uncached = [
+                module for module in modules
+                if self.cache is None or self._cache_key(self._analysis_request_body(module)) not in self.cache
+            ]
+            try:
+                await self._embed_modules(uncached)
+            except Exception as e:
+                logger.error(f"Error embedding modules for semantic cache: {e}")
+            modules, followers = self._group_near_duplicates(modules, uncached)
+        else:
+            followers = {}
+        
+        sem = self._llm_semaphore(concurrency)
+        
+        async def _guarded(module: VerilogModule) -> None:
+            async with sem:
+                logger.info(f"Analyzing module: {module.name}")
+                module.analysis = await self._analyze_single_module(module)
+            # Near-duplicates start once their representative's analysis is indexed
+            for follower in followers.get(id(module), ()):
+                await _guarded(follower)
+        
+        await asyncio.gather(*[_guarded(m) for m in modules])
+    
+    def _group_near_duplicates(self, modules: List[VerilogModule], uncached: List[VerilogModule]
+                               ) -> Tuple[List[VerilogModule], Dict[int, List[VerilogModule]]]:
+        """Split modules into the ones to dispatch and, by representative id, the near-duplicates of each
+        
+        Lookups for modules analyzed in the same run would otherwise all miss, since
+        none has been added to the semantic index when they start.
+        """
+        threshold = self.config['cache'].get('semantic_threshold', 0.92)
+        pending = {id(module) for module in uncached if module.embedding is not None}
+        leaders: List[VerilogModule] = []
+        representatives: List[VerilogModule] = []
+        followers: Dict[int, List[VerilogModule]] = {}
+        for module in modules:
+            if id(module) in pending:
+                for representative in representatives:
+                    # Both sides are unit vectors, so the dot product is the cosine similarity
+                    if sum(a * b for a, b in zip(module.embedding, representative.embedding)) >= threshold:
+                        followers[id(representative)].append(module)
+                        break
+                else:
+                    representatives.append(module)
+                    followers[id(module)] = []
+                    leaders.append(module)
+            else:
+                leaders.append(module)
+        return leaders, followers
+    
+    def _llm_semaphore(self, concurrency: Optional[int] = None) -> asyncio.Semaphore:
+        """Create a semaphore bounding concurrent LLM requests, defaulting to the configured limit"""
+        return asyncio.Semaphore(concurrency or self.config['azure_openai'].get('concurrency', 10))
     
-    def _analyze_single_module(self, module: VerilogModule) -> str:
+    async def _analyze_single_module(self, module: VerilogModule) -> str:
         """Analyze a single Verilog module using LLM"""
-        prompt = self._create_analysis_prompt(module)
+        self.stats['analyze']['invocations'] += 1
+        request = self._analysis_request_body(module)
+        key = self._cache_key(request)
+        cached = self._cache_get(key, 'analyze')
+        if cached is not None:
+            logger.info(f"Using cached analysis for module: {module.name}")
+            self._remember_analysis(module, cached)
+            return cached
+        
+        # The semantic cache is an optimization: if embedding fails, fall through to
+        # the chat completion rather than failing the module
+        if self.semantic_index is not None:
+            try:
+                await self._embed_modules([module])
+                similar = self._semantic_lookup(module.embedding)
+            except Exception as e:
+                logger.error(f"Semantic cache lookup failed for module {module.name}: {e}")
+                similar = None
+            if similar is not None:
+                logger.info(f"Using analysis of a near-duplicate module for: {module.name}")
+                self.stats['analyze']['semantic_hits'] += 1
+                # Not remembered: the exact store only holds this module's own analysis,
+                # so a near-duplicate's stays subject to the current semantic settings
+                return similar
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.config['azure_openai']['deployment_name'],
-                messages=[
-                    {"role": "system", "content": "You are an expert digital design engineer specializing in Verilog HDL analysis and documentation."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.config['azure_openai']['temperature'],
-                max_tokens=self.config['azure_openai']['max_tokens']
-            )
+            response = await self._call_llm_async(request, 'analyze')
             
-            return response.choices[0].message.content.strip()
+            analysis = response.choices[0].message.content.strip()
+            self._cache_set(key, analysis)
+            self._remember_analysis(module, analysis)
+            if self.semantic_index is not None and module.embedding is not None:
+                self._add_semantic_entry(module.embedding, analysis)
+            return analysis
             
         except Exception as e:
             logger.error(f"Error analyzing module {module.name}: {e}")
             return f"Analysis failed for module {module.name}: {str(e)}"
     
-    def _create_analysis_prompt(self, module: VerilogModule) -> str:
-        """Create a detailed analysis prompt for the LLM"""
+    @llm_retry
+    async def _call_llm_async(self, request: Dict[str, Any], stage: str) -> Any:
+        """Send a chat completion request on the async client, retrying transient errors"""
+        response = await self.aclient.chat.completions.create(**request)
+        self._record_usage(stage, response.usage)
+        return response
+    
+    def _analysis_request_body(self, module: VerilogModule) -> Dict[str, Any]:
+        """Build the chat completion request body used to analyze a module"""
+        config = self.config['azure_openai']
+        return {
+            "model": config['deployment_name'],
+            "messages": [
+                {"role": "system", "content": self._static_system_prompt()},
+                {"role": "user", "content": self._user_module_prompt(module)}
+            ],
+            "temperature": config['temperature'],
+            "max_tokens": config['max_tokens']
+        }
+    
+    @llm_retry
+    def _upload_batch_file(self, batch_path: str) -> Any:
+        """Upload a batch input file, reopening it on each attempt"""
+        with open(batch_path, 'rb') as file:
+            return self.client.files.create(file=file, purpose="batch")
+    
+    def _analyze_modules_batch(self, modules: List[VerilogModule]) -> None:
+        """Analyze the given modules with a single Azure OpenAI Batch API job"""
+        config = self.config['azure_openai']
+        custom_ids = {}
+        requests = {}
+        for index, module in enumerate(modules):
+            self.stats['analyze']['invocations'] += 1
+            request = self._analysis_request_body(module)
+            cached = self._cache_get(self._cache_key(request), 'analyze')
+            if cached is not None:
+                module.analysis = cached
+                self._remember_analysis(module, cached)
+                continue
+            custom_id = f"{index}-{module.name}"
+            custom_ids[custom_id] = module
+            requests[custom_id] = request
+        
+        if not custom_ids:
+            logger.info("All module analyses served from cache; skipping batch submission")
+            return
+        
+        # Serialize one chat completion request per module into a JSONL input file
+        with tempfile.NamedTemporaryFile('wb', suffix='.jsonl', delete=False) as batch_file:
+            for custom_id, request in requests.items():
+                batch_file.write(_json_dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/chat/completions",
+                    "body": request
+                }) + b"\n")
+            batch_path = batch_file.name
+        
+        # Each API call retries on its own, so a dropped connection while polling
+        # does not abandon a job that keeps running server-side
+        try:
+            input_file = self._upload_batch_file(batch_path)
+            batch = llm_retry(self.client.batches.create)(
+                input_file_id=input_file.id,
+                endpoint="/chat/completions",
+                completion_window="24h"
+            )
+            logger.info(f"Submitted batch {batch.id} with {len(custom_ids)} module analyses")
+            
+            # Poll with exponential backoff until the batch reaches a terminal state
+            delay = config.get('batch_poll_interval', 10)
+            while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+                time.sleep(delay)
+                delay = min(delay * 2, config.get('batch_poll_max_interval', 300))
+                batch = llm_retry(self.client.batches.retrieve)(batch.id)
+                logger.info(f"Batch {batch.id} status: {batch.status}")
+            
+            if batch.status != 'completed' or not batch.output_file_id:
+                raise RuntimeError(f"batch {batch.id} finished with status {batch.status}")
+            
+            results = {}
+            for line in llm_retry(self.client.files.content)(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = _json_loads(line)
+                response = record.get('response') or {}
+                if response.get('status_code') == 200:
+                    self._record_usage('analyze', response['body'].get('usage'))
+                    analysis = response['body']['choices'][0]['message']['content'].strip()
+                    results[record['custom_id']] = analysis
+                    self._cache_set(self._cache_key(requests[record['custom_id']]), analysis)
+                    self._remember_analysis(custom_ids[record['custom_id']], analysis)
+                else:
+                    logger.error(f"Batch request {record['custom_id']} failed: {record.get('error') or response.get('body')}")
+        
+        except Exception as e:
+            logger.error(f"Error running batch analysis: {e}")
+            results = {}
+        
+        finally:
+            os.remove(batch_path)
+        
+        for custom_id, module in custom_ids.items():
+            module.analysis = results.get(custom_id, f"Analysis failed for module {module.name}: no batch result")
+    
+    def _static_system_prompt(self) -> str:
+        """Build the system prompt shared by every module analysis request"""
+        # Depends only on configuration, so it is byte-identical across calls and
+        # forms a stable prefix for Azure OpenAI's automatic prompt caching
         sections = self.config['analysis']['include_sections']
         max_length = self.config['analysis']['output_format']['max_section_length']
         
-        prompt = f"""
-        Analyze the following Verilog module and provide a comprehensive technical analysis suitable for a specification document.
-
-        Module Name: {module.name}
-        File: {module.filename}
-
-        Verilog Code:
-        ```verilog
-        {module.code}
-        ```
-
-        Please provide analysis covering these sections (keep each section under {max_length} words):
-        """
-        
         section_descriptions = {
             'functionality_overview': 'High-level description of what this module does',
             'module_interface': 'Detailed description of inputs, outputs, and parameters',
@@ -213,179 +995,225 @@ class VerilogAnalyzer:
             'test_considerations': 'Testing strategies and verification considerations'
         }
         
+        prompt = (
+            "You are an expert digital design engineer specializing in Verilog HDL analysis and documentation.\n\n"
+            "Analyze the Verilog module provided by the user and provide a comprehensive technical analysis suitable for a specification document.\n\n"
+            f"Please provide analysis covering these sections (keep each section under {max_length} words):"
+        )
+        
         for section in sections:
             if section in section_descriptions:
                 prompt += f"\n- {section.replace('_', ' ').title()}: {section_descriptions[section]}"
         
         prompt += """
 
-        Format your response as clear, technical prose suitable for inclusion in an professional specification document. 
-        Use proper technical terminology and maintain a professional tone throughout.
-        Focus on the design intent, functionality, and implementation details. Do not include any other text or comments. Do not output in markdown format.
-        """
+Format your response as clear, technical prose suitable for inclusion in an professional specification document.
+Use proper technical terminology and maintain a professional tone throughout.
+Focus on the design intent, functionality, and implementation details. Do not include any other text or comments. Do not output in markdown format."""
         
         return prompt
     
+    def _clean_code(self, code: str) -> str:
+        """Strip comments and collapse blank lines so they are not billed as prompt tokens"""
+        if not self.config['analysis'].get('strip_comments', True):
+            return code
+        
+        clean = self._RE_TRAILING_SPACE.sub('', self._CODE_CLEAN.sub('', code))
+        return self._RE_BLANK_LINES.sub('\n\n', clean).strip()
+    
+    def _user_module_prompt(self, module: VerilogModule) -> str:
+        """Build the per-module part of an analysis request"""
+        buffer = io.StringIO()
+        buffer.write(f"Module Name: {module.name}\nFile: {module.filename}\n\n```verilog\n")
+        buffer.write(self._clean_code(module.code))
+        buffer.write("\n```")
+        if module.dependencies:
+            buffer.write("\n\nINSTANTIATED MODULES:\n")
+            for name in module.dependencies:
+                child = self.modules_by_name[name]
+                buffer.write(f"- {child.name}: inputs {', '.join(child.inputs) or 'None'}; "
+                             f"outputs {', '.join(child.outputs) or 'None'}\n")
+        return buffer.getvalue()
+    
     def generate_latex_document(self, template_path: str = "template.tex", output_path: str = None) -> None:
-        """Generate LaTeX documentation using the template"""
+        """Generate LaTeX documentation using the template (synchronous wrapper)"""
+        asyncio.run(self.generate_latex_document_async(template_path, output_path))
+    
+    async def generate_latex_document_async(self, template_path: str = "template.tex", output_path: str = None) -> None:
+        """Generate LaTeX documentation using the template inside an existing event loop"""
         if output_path is None:
             output_path = self.config['output']['latex_filename']
         
         logger.info(f"Generating LaTeX document: {output_path}")
         
-        # Read the template
+        # Read the template and split it around \begin{document} ... \end{document}
         with open(template_path, 'r') as file:
-            template_content = file.read()
+            head, tail = self._split_template(file.read())
+        
+        # Stream each part into a sibling file through a large write buffer as it
+        # completes, then rename it into place so a failed run leaves no partial document
+        partial_path = f"{output_path}.tmp"
+        try:
+            with open(partial_path, 'w', buffering=1 << 20) as file:
+                file.write(head)
+                file.write('\\begin{document}\n\n')
+                await self._generate_complete_document(file)
+                file.write('\n\n\\end{document}')
+                file.write(tail)
+            os.replace(partial_path, output_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
         
-        # Generate complete document content with LLM-defined structure
-        document_content = self._generate_complete_document()
+        logger.info(f"LaTeX document generated successfully: {output_path}")
+    
+    async def _generate_complete_document(self, out: TextIO) -> None:
+        """Generate the document body part by part and write the parts to out in order"""
+        sem = self._llm_semaphore()
         
-        # Replace all content between \begin{document} and \end{document}
-        template_content = self._replace_entire_document_content(template_content, document_content)
+        async def _guarded(part) -> str:
+            async with sem:
+                return await part
         
-        # Write the output file
-        with open(output_path, 'w') as file:
-            file.write(template_content)
+        # Start every part at once; the semaphore bounds how many are in flight
+        intro = asyncio.ensure_future(_guarded(self._generate_intro()))
+        sections = [asyncio.ensure_future(_guarded(self._generate_module_section(m))) for m in self.modules]
+        conclusions = asyncio.ensure_future(_guarded(self._generate_conclusions(self.modules)))
         
-        logger.info(f"LaTeX document generated successfully: {output_path}")
+        # Write each part as soon as it and everything before it has finished
+        parts = [intro, *sections, conclusions]
+        try:
+            out.write(await intro)
+            out.write("\n\n\\newpage\n\\tableofcontents\n\\newpage\n\n")
+            for section in sections:
+                out.write(await section)
+                out.write("\n\n")
+            out.write(await conclusions)
+        finally:
+            # A failed write or cancellation must not leave parts calling the LLM
+            for part in parts:
+                part.cancel()
     
-
+    async def _generate_intro(self) -> str:
+        """Generate the title page and introduction"""
+        return await self._generate_document_part(
+            INTRO_INSTRUCTIONS,
+            self._format_module_summaries(self.modules, include_analysis=False),
+            FALLBACK_INTRO
+        )
     
-    def _generate_complete_document(self) -> str:
-        """Generate the complete document content with LLM-defined structure"""
-        # Prepare detailed module information for the LLM
-        detailed_modules = []
-        for module in self.modules:
-            detailed_modules.append({
-                'name': module.name,
-                'filename': module.filename,
-                'code': module.code,
-                'analysis': module.analysis,
-                'ports': module.ports
-            })
-        
-        # Create comprehensive prompt for entire document
-        document_prompt = f"""
-        Create a comprehensive digital design specification document for the following Verilog modules. 
-        You have complete freedom to create appropriate headings and structure the document as you see fit.
-        
-        MODULES TO ANALYZE:
-        {self._format_modules_for_prompt(detailed_modules)}
-        
-        FORMATTING REQUIREMENTS:
-        - Use LaTeX formatting (\\section{{}}, \\subsection{{}}, etc.)
-        - Do NOT include \\documentclass, \\usepackage, \\begin{{document}} or \\end{{document}} 
-        - Do NOT include any preamble or document setup commands
-        - ONLY provide the content that goes inside the document body
-        - Start with a title page using \\begin{{center}} environment
-        - After the title page, add: \\newpage followed by \\tableofcontents followed by \\newpage
-        - Include detailed technical analysis of each module
-        - Create logical sections and subsections as appropriate
-        - Use proper LaTeX syntax for all formatting
-        - Include academic-style content suitable for a university specification document
-        
-        CONTENT REQUIREMENTS:
-        1. Title page (center environment with title, institution, date)
-        2. Table of contents (\\tableofcontents)
-        3. Create an introduction/overview section
-        4. For EACH module, create a dedicated section with:
-           - Complete code listing (use \\begin{{verbatim}} \\end{{verbatim}} for code)
-           - Detailed functional analysis
-           - Interface description (inputs, outputs, parameters)
-           - Behavioral analysis
-           - Timing considerations
-           - Design patterns used
-           - Potential improvements
-        5. Create a conclusions/summary section
-        6. Add any other sections you deem appropriate (references, appendices, etc.)
-        
-        Make the document comprehensive, technical, and professionally structured.
-        """
+    async def _generate_module_section(self, module: VerilogModule) -> str:
+        """Generate the dedicated document section for one module"""
+        fallback = (
+            f"\\section{{{self._latex_escape(module.name)}}}\n"
+            f"\\begin{{verbatim}}\n{module.code}\n\\end{{verbatim}}\n\n"
+            f"{self._latex_escape(module.analysis)}"
+        ).rstrip()
+        return await self._generate_document_part(
+            MODULE_SECTION_INSTRUCTIONS,
+            self._format_modules_for_prompt([module]),
+            fallback
+        )
+    
+    async def _generate_conclusions(self, modules: List[VerilogModule]) -> str:
+        """Generate the conclusions and closing sections"""
+        return await self._generate_document_part(
+            CONCLUSIONS_INSTRUCTIONS,
+            self._format_module_summaries(modules, include_analysis=True),
+            FALLBACK_CONCLUSIONS
+        )
+    
+    async def _generate_document_part(self, instructions: str, content: str, fallback: str) -> str:
+        """Generate one part of the document body, falling back to static LaTeX on failure"""
+        request = {
+            "model": self.config['azure_openai']['deployment_name'],
+            "messages": [
+                {"role": "system", "content": f"{DOCUMENT_SYSTEM_PROMPT}\n\n{instructions}"},
+                {"role": "user", "content": content}
+            ],
+            "temperature": self.config['azure_openai']['temperature'],
+            "max_tokens": self.config['azure_openai']['max_tokens']
+        }
+        self.stats['document']['invocations'] += 1
+        key = self._cache_key(request)
+        cached = self._cache_get(key, 'document')
+        if cached is not None:
+            logger.info("Using cached document content")
+            return cached
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.config['azure_openai']['deployment_name'],
-                messages=[
-                    {"role": "system", "content": "You are an expert digital design engineer and technical writer. Create comprehensive, professional documentation."},
-                    {"role": "user", "content": document_prompt}
-                ],
-                temperature=self.config['azure_openai']['temperature'],
-                max_tokens=4000
-            )
-            return response.choices[0].message.content.strip()
+            response = await self._call_llm_async(request, 'document')
+            text = response.choices[0].message.content.strip()
+            self._cache_set(key, text)
+            return text
         except Exception as e:
             logger.error(f"Error generating document content: {e}")
-            return self._generate_fallback_document()
+            return fallback
+    
+    def _format_module_summaries(self, modules: List[VerilogModule], include_analysis: bool) -> str:
+        """Format module names and interfaces (and optionally analysis previews) without source code"""
+        preview_chars = 0
+        if include_analysis and modules:
+            preview_chars = min(self._SUMMARY_PREVIEW_MAX_CHARS, self._SUMMARY_ANALYSIS_CHARS // len(modules))
+            if preview_chars < self._SUMMARY_PREVIEW_MIN_CHARS:
+                preview_chars = 0
+        buffer = io.StringIO()
+        buffer.write("MODULES IN THIS DOCUMENT:\n")
+        for module in modules:
+            buffer.write(f"\nMODULE: {module.name} (File: {module.filename})\n")
+            buffer.write(f"- Inputs: {', '.join(module.inputs) if module.inputs else 'None'}\n")
+            buffer.write(f"- Outputs: {', '.join(module.outputs) if module.outputs else 'None'}\n")
+            buffer.write(f"- Inouts: {', '.join(module.inouts) if module.inouts else 'None'}\n")
+            buffer.write(f"- Parameters: {', '.join(f'{p[0]}={p[1]}' for p in module.parameters) if module.parameters else 'None'}\n")
+            if preview_chars:
+                buffer.write(f"ANALYSIS (excerpt):\n{module.analysis[:preview_chars]}\n")
+        return buffer.getvalue()
     
-    def _format_modules_for_prompt(self, modules) -> str:
+    def _format_modules_for_prompt(self, modules: List[VerilogModule]) -> str:
         """Format module information for the LLM prompt"""
-        formatted = []
+        # Write every module straight into one buffer so each source is copied
+        # once into the prompt, rather than into per-module strings that are joined
+        buffer = io.StringIO()
+        buffer.write("MODULES TO ANALYZE:\n")
         for module in modules:
-            formatted.append(f"""
-MODULE: {module['name']} (File: {module['filename']})
-CODE:
-```verilog
-{module['code']}
-```
-
-ANALYSIS:
-{module['analysis']}
-
-INTERFACE:
-- Inputs: {', '.join(module['ports']['inputs']) if module['ports']['inputs'] else 'None'}
-- Outputs: {', '.join(module['ports']['outputs']) if module['ports']['outputs'] else 'None'}
-- Parameters: {', '.join([f"{p[0]}={p[1]}" for p in module['ports']['parameters']]) if module['ports']['parameters'] else 'None'}
-""")
-        return '\n'.join(formatted)
-    
-    def _generate_fallback_document(self) -> str:
-        """Generate a fallback document if LLM generation fails"""
-        content = """
-\\begin{center}
-{\\Huge{Verilog Module Specification}} \\\\
-\\vspace{2mm}
-{\\Large{Digital Design Analysis}} \\\\
-\\vspace{1mm}
-{\\Large{Technical Documentation}}
-\\end{center}
-
-\\newpage
-\\tableofcontents
-\\newpage
-
-\\section{Introduction}
-This document provides a comprehensive analysis of Verilog modules for digital design applications.
-
-\\section{Module Analysis}
-Detailed analysis of each module would be provided here.
-
-\\section{Conclusions}
-Summary and conclusions would be provided here.
-"""
-        return content
+            buffer.write(f"\nMODULE: {module.name} (File: {module.filename})\nCODE:\n```verilog\n")
+            buffer.write(module.code)
+            buffer.write("\n```\n\nANALYSIS:\n")
+            buffer.write(module.analysis)
+            buffer.write("\n\nINTERFACE:\n")
+            buffer.write(f"- Inputs: {', '.join(module.inputs) if module.inputs else 'None'}\n")
+            buffer.write(f"- Outputs: {', '.join(module.outputs) if module.outputs else 'None'}\n")
+            buffer.write(f"- Inouts: {', '.join(module.inouts) if module.inouts else 'None'}\n")
+            buffer.write(f"- Parameters: {', '.join(f'{p[0]}={p[1]}' for p in module.parameters) if module.parameters else 'None'}\n")
+        return buffer.getvalue()
     
-    def _replace_entire_document_content(self, template_content: str, new_content: str) -> str:
-        """Replace everything between \\begin{document} and \\end{document}"""
-        begin_doc = template_content.find('\\begin{document}')
-        end_doc = template_content.find('\\end{document}')
+    @staticmethod
+    def _latex_escape(text: str) -> str:
+        """Escape LaTeX special characters in plain text"""
+        replacements = {
+            '\\': r'\textbackslash{}', '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#',
+            '_': r'\_', '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}', '^': r'\textasciicircum{}'
+        }
+        return ''.join(replacements.get(char, char) for char in text)
+    
+    def _split_template(self, template_content: str) -> Tuple[str, str]:
+        """Return the template text before \\begin{document} and after \\end{document}"""
+        head, begin_marker, rest = template_content.partition('\\begin{document}')
+        _, end_marker, tail = rest.partition('\\end{document}')
         
-        if begin_doc == -1 or end_doc == -1:
+        if not begin_marker or not end_marker:
             logger.error("Could not find document boundaries in template")
-            return template_content
-        
-        # Keep everything before \\begin{document} and after \\end{document}
-        before_doc = template_content[:begin_doc + len('\\begin{document}')]
-        after_doc = template_content[end_doc:]
+            raise ValueError("Template must contain \\begin{document} and \\end{document}")
         
-        # Insert new content
-        new_document = before_doc + '\n\n' + new_content + '\n\n' + after_doc
-        
-        return new_document
-    
-
+        return head, tail
     
     def run_complete_analysis(self, input_dir: str = None, template_path: str = "template.tex", output_path: str = None) -> None:
-        """Run the complete analysis pipeline"""
+        """Run the complete analysis pipeline (synchronous wrapper)"""
+        asyncio.run(self.run_complete_analysis_async(input_dir, template_path, output_path))
+    
+    async def run_complete_analysis_async(self, input_dir: str = None, template_path: str = "template.tex", output_path: str = None) -> None:
+        """Run the complete analysis pipeline inside an existing event loop"""
         logger.info("Starting complete Verilog analysis pipeline...")
         
         # Load Verilog files
@@ -396,10 +1224,10 @@ Summary and conclusions would be provided here.
             return
         
         # Analyze modules with LLM
-        self.analyze_modules()
+        await self._analyze_all()
         
         # Generate LaTeX document
-        self.generate_latex_document(template_path, output_path)
+        await self.generate_latex_document_async(template_path, output_path)
         
         logger.info("Analysis pipeline completed successfully!")
         
@@ -408,6 +1236,35 @@ Summary and conclusions would be provided here.
         print(f"- Processed {len(self.modules)} Verilog modules")
         print(f"- Generated LaTeX document: {output_path or self.config['output']['latex_filename']}")
         print(f"- Modules analyzed: {', '.join([m.name for m in self.modules])}")
+        print(f"\n{self._format_stats_table()}")
+    
+    def _format_stats_table(self) -> str:
+        """Render per-stage invocation, cache and token counters as a text table"""
+        columns = ['Stage', 'Invocations', 'Exact hits', 'Semantic hits', 'LLM calls',
+                   'Prompt tok', 'Completion tok', 'Total tok', 'Avg tok/inv']
+        rows = []
+        for stage, stats in self.stats.items():
+            if not stats['invocations']:
+                continue
+            rows.append([
+                stage,
+                stats['invocations'],
+                stats['exact_hits'],
+                stats['semantic_hits'],
+                stats['llm_calls'],
+                stats['prompt_tokens'],
+                stats['completion_tokens'],
+                stats['total_tokens'],
+                f"{stats['total_tokens'] / stats['invocations']:.1f}"
+            ])
+        
+        widths = [max(len(str(row[i])) for row in [columns] + rows) for i in range(len(columns))]
+        lines = [
+            "  ".join(str(value).ljust(width) if i == 0 else str(value).rjust(width) for i, (value, width) in enumerate(zip(row, widths)))
+            for row in [columns] + rows
+        ]
+        lines.insert(1, "  ".join('-' * width for width in widths))
+        return "\n".join(lines)
 
 def main():
     """Main function to run the analyzer"""
@@ -7,10 +7,15 @@ by LLMs to interactively analyze Verilog files and generate specification docume
 """
 
 import asyncio
+import dataclasses
+import hashlib
+import io
 import os
-import json
+import stat as stat_module
 import logging
-from typing import Any, Dict, List, Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from mcp.server.models import InitializationOptions
@@ -22,7 +27,10 @@ from mcp.types import (
 import mcp.types as types
 
 # Import our existing Verilog analyzer
-from verilog_analyzer import VerilogAnalyzer, VerilogModule
+from verilog_analyzer import (
+    PARSER_VERSION, LRUCache, Ports, VerilogAnalyzer, VerilogModule,
+    _atomic_write_bytes, _json_dumps, _json_loads
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,155 +39,333 @@ logger = logging.getLogger("verilog-mcp-server")
 # Global analyzer instance
 analyzer_instance: Optional[VerilogAnalyzer] = None
 
+# Parsed modules keyed by a BLAKE2b digest of the file bytes. _PARSE_META maps a
+# path to (mtime_ns, size, digest) so unchanged files are not even re-hashed.
+# The LRU bound (cache.parse_maxsize) keeps memory flat on large trees.
+_PARSE_CACHE = LRUCache(256)
+_PARSE_META: Dict[str, Tuple[int, int, str]] = {}
+
+# Worker processes for parsing, shared across tool calls so they stay warm
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+
+# Cross-session cache tree. CACHE_VERSION changes with the on-disk layout; each
+# entry also carries the parser version that produced it.
+CACHE_VERSION = 1
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'verilog-mcp' / f'v{CACHE_VERSION}'
+_PARSE_CACHE_DIR = CACHE_DIR / 'parse'
+
+def _load_parsed_module(digest: str) -> Optional[VerilogModule]:
+    """Load a module parsed by a previous server run, if one was persisted"""
+    entry_path = _PARSE_CACHE_DIR / f"{digest}.json"
+    try:
+        entry = _json_loads(entry_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if entry.get('parser_version') != PARSER_VERSION:
+        entry_path.unlink(missing_ok=True)  # Written by an older parser; re-parse
+        return None
+    fields = entry['module']
+    fields['parameters'] = [tuple(p) for p in fields['parameters']]
+    return VerilogModule(**fields)
+
+def _store_parsed_module(digest: str, module: VerilogModule) -> None:
+    """Persist a parsed module so server restarts keep the cache"""
+    entry = {'parser_version': PARSER_VERSION, 'module': dataclasses.asdict(module)}
+    try:
+        _atomic_write_bytes(_PARSE_CACHE_DIR / f"{digest}.json", _json_dumps(entry))
+    except OSError as e:
+        logger.warning(f"Could not persist parse cache entry for {module.filename}: {e}")
+
+def _create_analyzer(config_path: str = "config.yaml") -> VerilogAnalyzer:
+    """Create the analyzer and size the server's caches from its configuration"""
+    analyzer = VerilogAnalyzer(config_path)
+    _PARSE_CACHE.resize(analyzer.config.get('cache', {}).get('parse_maxsize', 256))
+    return analyzer
+
+def _parse_pool() -> ProcessPoolExecutor:
+    """Return the shared parse pool, starting it on first use outside main()"""
+    global _PARSE_POOL
+    if _PARSE_POOL is None:
+        # Workers come from a forkserver, not a fork of this multithreaded
+        # process, so they cannot inherit a lock held by another thread
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        _PARSE_POOL = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                          mp_context=multiprocessing.get_context(start_method))
+    return _PARSE_POOL
+
+def _parse_one(file_path: str, data: bytes) -> Optional[VerilogModule]:
+    """Parse one Verilog file's contents; top-level so worker processes can run it"""
+    try:
+        return VerilogAnalyzer._parse_verilog_source(VerilogAnalyzer._decode_source(data), file_path)
+    except Exception as e:
+        logger.error(f"Error parsing {file_path}: {e}")
+        return None
+
+async def _read_all(file_paths: List[str]) -> List[Optional[bytes]]:
+    """Read files concurrently without blocking the event loop; unreadable files yield None"""
+    async def _read(file_path: str) -> Optional[bytes]:
+        try:
+            return await asyncio.to_thread(Path(file_path).read_bytes)
+        except OSError as e:
+            logger.error(f"Error reading {file_path}: {e}")
+            return None
+    return await asyncio.gather(*(_read(file_path) for file_path in file_paths))
+
+def _stat(path: str) -> Optional[os.stat_result]:
+    """stat() a path, returning None if it does not exist"""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+async def _load_modules(file_paths: List[str], stats: Optional[Dict[str, os.stat_result]] = None) -> List[VerilogModule]:
+    """Parse Verilog files, reusing results for unchanged content and fanning the rest out over processes"""
+    parsed: Dict[str, VerilogModule] = {}
+    to_read: List[Tuple[str, os.stat_result]] = []
+    for file_path in file_paths:
+        try:
+            stat = stats[file_path] if stats and file_path in stats else os.stat(file_path)
+        except OSError as e:
+            logger.error(f"Error reading {file_path}: {e}")
+            continue
+        if analyzer_instance._exceeds_size_limit(file_path, stat.st_size):
+            continue
+        # Files whose mtime and size are unchanged are not even re-read
+        meta = _PARSE_META.get(file_path)
+        module = None
+        if meta is not None and meta[:2] == (stat.st_mtime_ns, stat.st_size):
+            module = _PARSE_CACHE.get(meta[2])
+        if module is not None:
+            parsed[file_path] = module
+        else:
+            to_read.append((file_path, stat))
+    
+    # I/O stage: read every stale file concurrently, then look its content up by digest
+    misses: List[Tuple[str, str, bytes]] = []
+    contents = await _read_all([file_path for file_path, _ in to_read])
+    for (file_path, stat), data in zip(to_read, contents):
+        if data is None:
+            continue
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        _PARSE_META[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+        module = _PARSE_CACHE.get(digest) or _load_parsed_module(digest)
+        if module is None:
+            misses.append((file_path, digest, data))
+        else:
+            _PARSE_CACHE.put(digest, module)
+            parsed[file_path] = module
+    
+    # CPU stage: regex parsing is CPU-bound, so use processes rather than threads
+    if misses:
+        miss_paths = [file_path for file_path, _, _ in misses]
+        miss_data = [data for _, _, data in misses]
+        if len(misses) == 1:
+            results = [_parse_one(miss_paths[0], miss_data[0])]
+        else:
+            executor = _parse_pool()
+            results = await asyncio.to_thread(
+                lambda: list(executor.map(_parse_one, miss_paths, miss_data, chunksize=4))
+            )
+        for (file_path, digest, _), module in zip(misses, results):
+            if module is not None:
+                _PARSE_CACHE.put(digest, module)
+                _store_parsed_module(digest, module)
+                parsed[file_path] = module
+    
+    logger.info(f"Parse cache: {_PARSE_CACHE.describe()}")
+    
+    # Hand out copies: callers attach analyses to the modules they load
+    return [
+        dataclasses.replace(
+            module,
+            filename=os.path.basename(file_path),
+            inputs=list(module.inputs),
+            outputs=list(module.outputs),
+            inouts=list(module.inouts),
+            parameters=list(module.parameters),
+        )
+        for file_path, module in ((p, parsed.get(p)) for p in file_paths)
+        if module is not None
+    ]
+
 # Create the MCP server
 server = Server("verilog-analyzer")
 
-@server.list_tools()
-async def handle_list_tools() -> list[Tool]:
-    """List available Verilog analysis tools"""
-    return [
-        Tool(
-            name="initialize_analyzer",
-            description="Initialize the Verilog analyzer with configuration",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "config_path": {
-                        "type": "string",
-                        "description": "Path to configuration file (default: config.yaml)",
-                        "default": "config.yaml"
-                    }
+def _write_ports(buffer: io.StringIO, ports: Ports) -> None:
+    """Write the port and parameter lines shared by the tool responses"""
+    buffer.write(f"Inputs: {', '.join(ports.inputs) or 'None'}\n")
+    buffer.write(f"Outputs: {', '.join(ports.outputs) or 'None'}\n")
+    buffer.write(f"Inouts: {', '.join(ports.inouts) or 'None'}\n")
+    buffer.write(f"Parameters: {', '.join(f'{name}={value}' for name, value in ports.parameters) or 'None'}\n")
+
+def _fmt_module(module: VerilogModule, details: bool = False) -> str:
+    """Describe a module's interface, and with details its file and analysis preview"""
+    buffer = io.StringIO()
+    buffer.write(f"Module: {module.name}\n")
+    if details:
+        buffer.write(f"File: {module.filename}\n")
+    _write_ports(buffer, Ports(module.inputs, module.outputs, module.inouts, module.parameters))
+    if details:
+        buffer.write(f"Has Analysis: {'Yes' if module.analysis else 'No'}\n")
+        if module.analysis:
+            buffer.write(f"\nAnalysis Preview:\n{module.analysis[:300]}...")
+    return buffer.getvalue()
+
+# Tool schemas are static, so build them once rather than on every list_tools request
+_TOOLS_LIST = (
+    Tool(
+        name="initialize_analyzer",
+        description="Initialize the Verilog analyzer with configuration",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "config_path": {
+                    "type": "string",
+                    "description": "Path to configuration file (default: config.yaml)",
+                    "default": "config.yaml"
                 }
             }
-        ),
-        Tool(
-            name="load_verilog_files",
-            description="Load Verilog files from a directory",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "input_dir": {
-                        "type": "string",
-                        "description": "Directory path containing Verilog files"
-                    }
-                },
-                "required": ["input_dir"]
-            }
-        ),
-        Tool(
-            name="get_loaded_modules",
-            description="Get information about currently loaded Verilog modules",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="parse_verilog_file",
-            description="Parse a specific Verilog file and extract module information",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_path": {
-                        "type": "string",
-                        "description": "Path to the Verilog file to parse"
-                    }
-                },
-                "required": ["file_path"]
-            }
-        ),
-        Tool(
-            name="extract_ports",
-            description="Extract port information from Verilog code",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "verilog_code": {
-                        "type": "string",
-                        "description": "Verilog code to analyze for ports"
-                    }
-                },
-                "required": ["verilog_code"]
+        }
+    ),
+    Tool(
+        name="load_verilog_files",
+        description="Load Verilog files from a directory",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "input_dir": {
+                    "type": "string",
+                    "description": "Directory path containing Verilog files"
+                }
+            },
+            "required": ["input_dir"]
+        }
+    ),
+    Tool(
+        name="get_loaded_modules",
+        description="Get information about currently loaded Verilog modules",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="parse_verilog_file",
+        description="Parse a specific Verilog file and extract module information",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string",
+                    "description": "Path to the Verilog file to parse"
+                }
+            },
+            "required": ["file_path"]
+        }
+    ),
+    Tool(
+        name="extract_ports",
+        description="Extract port information from Verilog code",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "verilog_code": {
+                    "type": "string",
+                    "description": "Verilog code to analyze for ports"
+                }
+            },
+            "required": ["verilog_code"]
+        }
+    ),
+    Tool(
+        name="analyze_single_module",
+        description="Perform LLM analysis on a specific module",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_name": {
+                    "type": "string",
+                    "description": "Name of the module to analyze"
+                }
+            },
+            "required": ["module_name"]
+        }
+    ),
+    Tool(
+        name="analyze_all_modules",
+        description="Perform LLM analysis on all loaded modules",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "concurrency": {
+                    "type": "integer",
+                    "description": "Maximum concurrent LLM requests (default: azure_openai.concurrency from config)",
+                    "minimum": 1
+                }
             }
-        ),
-        Tool(
-            name="analyze_single_module",
-            description="Perform LLM analysis on a specific module",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_name": {
-                        "type": "string",
-                        "description": "Name of the module to analyze"
-                    }
+        }
+    ),
+    Tool(
+        name="generate_latex_document",
+        description="Generate LaTeX specification document from analyzed modules",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "template_path": {
+                    "type": "string",
+                    "description": "Path to LaTeX template file",
+                    "default": "template.tex"
                 },
-                "required": ["module_name"]
-            }
-        ),
-        Tool(
-            name="analyze_all_modules",
-            description="Perform LLM analysis on all loaded modules",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="generate_latex_document",
-            description="Generate LaTeX specification document from analyzed modules",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "template_path": {
-                        "type": "string",
-                        "description": "Path to LaTeX template file",
-                        "default": "template.tex"
-                    },
-                    "output_path": {
-                        "type": "string",
-                        "description": "Output path for generated LaTeX document"
-                    }
+                "output_path": {
+                    "type": "string",
+                    "description": "Output path for generated LaTeX document"
                 }
             }
-        ),
-        Tool(
-            name="run_complete_analysis",
-            description="Run the complete analysis pipeline from directory to LaTeX document",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "input_dir": {
-                        "type": "string",
-                        "description": "Directory path containing Verilog files"
-                    },
-                    "template_path": {
-                        "type": "string",
-                        "description": "Path to LaTeX template file",
-                        "default": "template.tex"
-                    },
-                    "output_path": {
-                        "type": "string",
-                        "description": "Output path for generated LaTeX document"
-                    }
+        }
+    ),
+    Tool(
+        name="run_complete_analysis",
+        description="Run the complete analysis pipeline from directory to LaTeX document",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "input_dir": {
+                    "type": "string",
+                    "description": "Directory path containing Verilog files"
                 },
-                "required": ["input_dir"]
-            }
-        ),
-        Tool(
-            name="get_module_details",
-            description="Get detailed information about a specific module",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_name": {
-                        "type": "string",
-                        "description": "Name of the module to get details for"
-                    }
+                "template_path": {
+                    "type": "string",
+                    "description": "Path to LaTeX template file",
+                    "default": "template.tex"
                 },
-                "required": ["module_name"]
-            }
-        )
-    ]
+                "output_path": {
+                    "type": "string",
+                    "description": "Output path for generated LaTeX document"
+                }
+            },
+            "required": ["input_dir"]
+        }
+    ),
+    Tool(
+        name="get_module_details",
+        description="Get detailed information about a specific module",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_name": {
+                    "type": "string",
+                    "description": "Name of the module to get details for"
+                }
+            },
+            "required": ["module_name"]
+        }
+    )
+)
+
+@server.list_tools()
+async def handle_list_tools() -> list[Tool]:
+    """List available Verilog analysis tools"""
+    return list(_TOOLS_LIST)
 
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextContent]:
@@ -189,7 +375,7 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
     try:
         if name == "initialize_analyzer":
             config_path = arguments.get("config_path", "config.yaml")
-            analyzer_instance = VerilogAnalyzer(config_path)
+            analyzer_instance = _create_analyzer(config_path)
             return [types.TextContent(
                 type="text",
                 text=f"Verilog analyzer initialized successfully with config: {config_path}"
@@ -197,23 +383,28 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
         
         # Ensure analyzer is initialized for other operations
         if analyzer_instance is None:
-            analyzer_instance = VerilogAnalyzer()
+            analyzer_instance = _create_analyzer()
         
         if name == "load_verilog_files":
             input_dir = arguments["input_dir"]
-            if not os.path.exists(input_dir):
+            dir_stat = _stat(input_dir)
+            if dir_stat is None:
                 return [types.TextContent(
                     type="text",
                     text=f"Error: Directory {input_dir} does not exist"
                 )]
+            if not stat_module.S_ISDIR(dir_stat.st_mode):
+                return [types.TextContent(
+                    type="text",
+                    text=f"Error: {input_dir} is not a directory"
+                )]
             
-            analyzer_instance.load_verilog_files(input_dir)
-            module_names = [module.name for module in analyzer_instance.modules]
+            analyzer_instance.add_modules(await _load_modules(analyzer_instance._find_verilog_files(input_dir)))
             
             return [types.TextContent(
                 type="text",
                 text=f"Successfully loaded {len(analyzer_instance.modules)} Verilog modules from {input_dir}:\n" + 
-                     f"Modules: {', '.join(module_names)}"
+                     f"Modules: {analyzer_instance._module_names_csv}"
             )]
         
         elif name == "get_loaded_modules":
@@ -235,25 +426,21 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
         
         elif name == "parse_verilog_file":
             file_path = arguments["file_path"]
-            if not os.path.exists(file_path):
+            file_stat = _stat(file_path)
+            if file_stat is None:
                 return [types.TextContent(
                     type="text",
                     text=f"Error: File {file_path} does not exist"
                 )]
             
-            # Parse the file
-            analyzer_instance._parse_verilog_file(file_path)
-            
-            # Find the newly parsed module
-            module = analyzer_instance.modules[-1] if analyzer_instance.modules else None
+            # Parse the file, reusing the stat result for the cache check
+            modules = await _load_modules([file_path], {file_path: file_stat})
+            module = modules[0] if modules else None
             if module:
+                analyzer_instance.add_modules([module])
                 return [types.TextContent(
                     type="text",
-                    text=f"Successfully parsed {file_path}:\n" +
-                         f"Module: {module.name}\n" +
-                         f"Inputs: {', '.join(module.ports['inputs']) if module.ports['inputs'] else 'None'}\n" +
-                         f"Outputs: {', '.join(module.ports['outputs']) if module.ports['outputs'] else 'None'}\n" +
-                         f"Parameters: {', '.join([f'{p[0]}={p[1]}' for p in module.ports['parameters']]) if module.ports['parameters'] else 'None'}"
+                    text=f"Successfully parsed {file_path}:\n{_fmt_module(module)}"
                 )]
             else:
                 return [types.TextContent(
@@ -263,27 +450,32 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
         
         elif name == "extract_ports":
             verilog_code = arguments["verilog_code"]
-            ports = analyzer_instance._extract_ports(verilog_code)
+            buffer = io.StringIO()
+            buffer.write("Extracted ports from Verilog code:\n")
+            _write_ports(buffer, analyzer_instance._extract_ports(verilog_code))
             
             return [types.TextContent(
                 type="text",
-                text=f"Extracted ports from Verilog code:\n" +
-                     f"Inputs: {', '.join(ports['inputs']) if ports['inputs'] else 'None'}\n" +
-                     f"Outputs: {', '.join(ports['outputs']) if ports['outputs'] else 'None'}\n" +
-                     f"Parameters: {', '.join([f'{p[0]}={p[1]}' for p in ports['parameters']]) if ports['parameters'] else 'None'}"
+                text=buffer.getvalue()
             )]
         
         elif name == "analyze_single_module":
             module_name = arguments["module_name"]
-            module = next((m for m in analyzer_instance.modules if m.name == module_name), None)
+            module = analyzer_instance.modules_by_name.get(module_name)
             
             if not module:
                 return [types.TextContent(
                     type="text",
-                    text=f"Module '{module_name}' not found. Available modules: {', '.join([m.name for m in analyzer_instance.modules])}"
+                    text=f"Module '{module_name}' not found. Available modules: {analyzer_instance._module_names_csv}"
                 )]
             
-            analysis = analyzer_instance._analyze_single_module(module)
+            # Unchanged source and dependencies analyzed with the same prompt and model skip the LLM
+            analyzer_instance._ensure_dependencies()
+            analysis = analyzer_instance._stored_analysis(module)
+            if analysis is None:
+                analysis = await analyzer_instance._analyze_single_module(module)
+                analyzer_instance._save_hash_cache()
+                analyzer_instance._save_semantic_index()
             module.analysis = analysis
             
             return [types.TextContent(
@@ -298,7 +490,7 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
                     text="No modules loaded. Use load_verilog_files first."
                 )]
             
-            analyzer_instance.analyze_modules()
+            await analyzer_instance._analyze_all(arguments.get("concurrency"))
             
             results = []
             for module in analyzer_instance.modules:
@@ -320,7 +512,7 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
             template_path = arguments.get("template_path", "template.tex")
             output_path = arguments.get("output_path")
             
-            analyzer_instance.generate_latex_document(template_path, output_path)
+            await analyzer_instance.generate_latex_document_async(template_path, output_path)
             
             final_output = output_path or analyzer_instance.config['output']['latex_filename']
             return [types.TextContent(
@@ -332,8 +524,24 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
             input_dir = arguments["input_dir"]
             template_path = arguments.get("template_path", "template.tex")
             output_path = arguments.get("output_path")
+            dir_stat = _stat(input_dir)
+            if dir_stat is None or not stat_module.S_ISDIR(dir_stat.st_mode):
+                return [types.TextContent(
+                    type="text",
+                    text=f"Error: {input_dir} is not a directory"
+                )]
             
-            analyzer_instance.run_complete_analysis(input_dir, template_path, output_path)
+            # Same load path as load_verilog_files, so the parse cache and worker pool apply here too
+            analyzer_instance.add_modules(await _load_modules(analyzer_instance._find_verilog_files(input_dir)))
+            if not analyzer_instance.modules:
+                return [types.TextContent(
+                    type="text",
+                    text=f"No Verilog modules found in {input_dir}"
+                )]
+            
+            await analyzer_instance._analyze_all()
+            await analyzer_instance.generate_latex_document_async(template_path, output_path)
+            logger.info(f"Analysis stats:\n{analyzer_instance._format_stats_table()}")
             
             final_output = output_path or analyzer_instance.config['output']['latex_filename']
             return [types.TextContent(
@@ -341,32 +549,22 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
                 text=f"Complete analysis pipeline finished successfully!\n" +
                      f"Processed {len(analyzer_instance.modules)} modules\n" +
                      f"Generated document: {final_output}\n" +
-                     f"Modules: {', '.join([m.name for m in analyzer_instance.modules])}"
+                     f"Modules: {analyzer_instance._module_names_csv}"
             )]
         
         elif name == "get_module_details":
             module_name = arguments["module_name"]
-            module = next((m for m in analyzer_instance.modules if m.name == module_name), None)
+            module = analyzer_instance.modules_by_name.get(module_name)
             
             if not module:
                 return [types.TextContent(
                     type="text",
-                    text=f"Module '{module_name}' not found. Available modules: {', '.join([m.name for m in analyzer_instance.modules])}"
+                    text=f"Module '{module_name}' not found. Available modules: {analyzer_instance._module_names_csv}"
                 )]
             
-            details = f"Module: {module.name}\n"
-            details += f"File: {module.filename}\n"
-            details += f"Inputs: {', '.join(module.ports['inputs']) if module.ports['inputs'] else 'None'}\n"
-            details += f"Outputs: {', '.join(module.ports['outputs']) if module.ports['outputs'] else 'None'}\n"
-            details += f"Parameters: {', '.join([f'{p[0]}={p[1]}' for p in module.ports['parameters']]) if module.ports['parameters'] else 'None'}\n"
-            details += f"Has Analysis: {'Yes' if module.analysis else 'No'}\n"
-            
-            if module.analysis:
-                details += f"\nAnalysis Preview:\n{module.analysis[:300]}..."
-            
             return [types.TextContent(
                 type="text",
-                text=details
+                text=_fmt_module(module, details=True)
             )]
         
         else:
@@ -384,26 +582,41 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
 
 async def main():
     """Run the MCP server"""
+    global analyzer_instance
     logger.info("Initializing Verilog Analyzer MCP Server")
     
     # Import the stdio server functionality
     from mcp.server.stdio import stdio_server
     
+    # Load the configuration, API clients and caches and start the parse workers
+    # up front so the first tool call does not pay for them. Without a usable
+    # default config the analyzer is left for initialize_analyzer to create.
+    try:
+        analyzer_instance = _create_analyzer()
+    except Exception as e:
+        logger.warning(f"Analyzer not preloaded: {e}")
+    # The executor starts its processes lazily, so run a trivial task on each
+    pool = _parse_pool()
+    list(pool.map(abs, range(os.cpu_count() or 1)))
+    
     logger.info("Starting Verilog Analyzer MCP Server...")
-    async with stdio_server() as (read_stream, write_stream):
-        logger.info("MCP server connected via stdio")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="verilog-analyzer",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            logger.info("MCP server connected via stdio")
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="verilog-analyzer",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        _PARSE_POOL.shutdown(cancel_futures=True)
 
 if __name__ == "__main__":
     asyncio.run(main())